@@ -3,26 +3,33 @@
 
 
 import os
+import re
+import copy
 import json
+import hashlib
 import numpy as np
 from os.path import join as pjoin
-from typing import Optional, Mapping, Dict
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import FrozenSet, List, Optional, Mapping, Dict, Sequence, Tuple
 
 from numpy.random import RandomState
 
 from textworld import g_rng
-from textworld.utils import maybe_mkdir, str2bool
+from textworld.utils import default_rng, dump_json, maybe_mkdir, str2bool
 from textworld.generator.chaining import ChainingOptions, sample_quest
 from textworld.generator.game import Game, Quest, World
 from textworld.generator.graph_networks import create_map, create_small_map
 from textworld.generator.text_generation import generate_text_from_grammar
 
 from textworld.generator import inform7
-from textworld.generator.inform7 import generate_inform7_source, compile_inform7_game
+from textworld.generator.inform7 import generate_inform7_source, generate_inform7_source_to
+from textworld.generator.inform7 import compile_inform7_game, compile_inform7_game_from_file
 from textworld.generator.inform7 import CouldNotCompileGameError
 
 from textworld.generator.data import load_data
-from textworld.generator.text_grammar import Grammar
+from textworld.generator.text_grammar import Grammar, GrammarFlags
 from textworld.generator.maker import GameMaker
 from textworld.generator.logger import GameLogger
 
@@ -31,6 +38,62 @@ class TextworldGenerationWarning(UserWarning):
     pass
 
 
+try:
+    from math import isqrt
+except ImportError:  # Python < 3.8.
+    def isqrt(n):
+        """ Integer square root, i.e. floor(sqrt(n)). """
+        root = int(n ** 0.5)
+        # Guard against floating point rounding errors.
+        while root * root > n:
+            root -= 1
+        while (root + 1) * (root + 1) <= n:
+            root += 1
+        return root
+
+
+#: Matches the name of any rule that is not a navigation rule.
+_NON_GO_RE = re.compile(r"^(?!go.*).*")
+
+
+@lru_cache(maxsize=None)
+def _non_go_rules():
+    """ Rules that are not navigation rules, filtered once then cached. """
+    return data.get_rules().get_matching(_NON_GO_RE)
+
+
+class _NonGoRulesOptions(ChainingOptions):
+    """ Chaining options forbidding quests ending with a navigation action. """
+
+    __slots__ = ()
+
+    def get_rules(self, depth):
+        if depth == 0:
+            # Last action should not be "go <dir>".
+            return _non_go_rules()
+        else:
+            return super().get_rules(depth)
+
+
+def _spawn_rngs(parent_seed, names: Sequence[str]) -> Dict[str, RandomState]:
+    """ Spawn named child random generators from a single seed.
+
+    SeedSequence guarantees the children are statistically independent,
+    without drawing one seed per child from the parent generator.
+
+    Arguments:
+        parent_seed: Either an int or an already spawned SeedSequence.
+        names: Keys for the returned generators.
+    """
+    if not isinstance(parent_seed, np.random.SeedSequence):
+        parent_seed = np.random.SeedSequence(parent_seed)
+
+    children = parent_seed.spawn(len(names))
+    return {name: RandomState(np.random.MT19937(child))
+            for name, child in zip(names, children)}
+
+
+@default_rng('rng')
 def make_map(n_rooms, size=None, rng=None, possible_door_states=["open", "closed", "locked"]):
     """ Make a map.
 
@@ -41,16 +104,17 @@ def make_map(n_rooms, size=None, rng=None, possible_door_states=["open", "closed
     size : tuple of int
         Size (height, width) of the grid delimiting the map.
     """
-    rng = g_rng.next() if rng is None else rng
-
     if size is None:
-        edge_size = int(np.ceil(np.sqrt(n_rooms + 1)))
+        # Smallest grid that can hold n_rooms + 1, i.e. ceil(sqrt(n_rooms + 1)).
+        root = isqrt(n_rooms)
+        edge_size = root if root * root >= n_rooms + 1 else root + 1
         size = (edge_size, edge_size)
 
     map = create_map(rng, n_rooms, size[0], size[1], possible_door_states)
     return map
 
 
+@default_rng('rng')
 def make_small_map(n_rooms, rng=None, possible_door_states=["open", "closed", "locked"]):
     """ Make a small map.
 
@@ -63,8 +127,6 @@ def make_small_map(n_rooms, rng=None, possible_door_states=["open", "closed", "l
     possible_door_states : list of str, optional
         Possible states doors can have.
     """
-    rng = g_rng.next() if rng is None else rng
-
     if n_rooms > 5:
         raise ValueError("Nb. of rooms of a small map must be less than 6 rooms.")
 
@@ -83,10 +145,8 @@ def make_world(world_size, nb_objects=0, rngs=None):
         Number of objects in the world.
     """
     if rngs is None:
-        rngs = {}
         rng = g_rng.next()
-        rngs['rng_map'] = RandomState(rng.randint(65635))
-        rngs['rng_objects'] = RandomState(rng.randint(65635))
+        rngs = _spawn_rngs(rng.randint(2 ** 31 - 1), ['rng_map', 'rng_objects'])
 
     map_ = make_map(n_rooms=world_size, rng=rngs['rng_map'])
     world = World.from_map(map_)
@@ -95,6 +155,7 @@ def make_world(world_size, nb_objects=0, rngs=None):
     return world
 
 
+@default_rng('rng')
 def make_world_with(rooms, rng=None):
     """ Make a world that contains the given rooms.
 
@@ -104,21 +165,21 @@ def make_world_with(rooms, rng=None):
         Rooms in the map. Variables must have type 'r'.
     """
     map = make_map(n_rooms=len(rooms), rng=rng)
-    for (n, d), room in zip(map.nodes.items(), rooms):
-        d["name"] = room.name
+    node_ids = list(map.nodes)
+    for node_id, room in zip(node_ids, rooms):
+        map.nodes[node_id]["name"] = room.name
 
     world = World.from_map(map)
     world.set_player_room()
     return world
 
 
+@default_rng('rng')
 def make_quest(world, quest_length, rng=None, rules_per_depth=(), backward=False):
     state = world
     if hasattr(world, "state"):
         state = world.state
 
-    rng = g_rng.next() if rng is None else rng
-
     # Sample a quest according to quest_length.
     options = ChainingOptions()
     options.backward = backward
@@ -129,13 +190,43 @@ def make_quest(world, quest_length, rng=None, rules_per_depth=(), backward=False
     return Quest(chain.actions)
 
 
-def make_grammar(flags: Mapping = {}, rng: Optional[RandomState] = None) -> Grammar:
-    rng = g_rng.next() if rng is None else rng
-    grammar = Grammar(flags, rng)
+@lru_cache(maxsize=32)
+def _grammar_template(frozen_flags: FrozenSet[Tuple]) -> Grammar:
+    """ Build and validate a grammar to be used as a template.
+
+    Parsing and checking a grammar only depends on the flags, so the
+    result can be shared across games with identical flags.
+    """
+    # The template's rng is never used; copies get the caller's rng.
+    grammar = Grammar(dict(frozen_flags), rng=RandomState(0))
     grammar.check()
     return grammar
 
 
+@default_rng('rng')
+def make_grammar(flags: Mapping = {}, rng: Optional[RandomState] = None) -> Grammar:
+    try:
+        template = _grammar_template(frozenset(flags.items()))
+    except TypeError:  # Unhashable flag value (e.g. names_to_exclude).
+        grammar = Grammar(flags, rng)
+        grammar.check()
+        return grammar
+
+    # Skip re-parsing the grammar files and re-running check(), but give
+    # the copy its own rng and mutable state so neither text generation
+    # nor callers mutating the grammar in place can poison the cached
+    # template. The production rule values are immutable tuples, so a
+    # shallow dict copy is enough.
+    grammar = copy.copy(template)
+    grammar.rng = rng
+    grammar.flags = GrammarFlags(flags)
+    grammar.grammar = OrderedDict(template.grammar)
+    grammar.all_expansions = defaultdict(list)
+    grammar.overflow_dict = OrderedDict()
+    grammar.used_names = set(grammar.flags.names_to_exclude)
+    return grammar
+
+
 def make_game_with(world, quests=None, grammar=None):
     game = Game(world, grammar, quests)
     if grammar is None:
@@ -165,27 +256,15 @@ def make_game(world_size: int, nb_objects: int, quest_length: int, quest_breadth
         Generated game.
     """
     if rngs is None:
-        rngs = {}
         rng = g_rng.next()
-        rngs['rng_map'] = RandomState(rng.randint(65635))
-        rngs['rng_objects'] = RandomState(rng.randint(65635))
-        rngs['rng_quest'] = RandomState(rng.randint(65635))
-        rngs['rng_grammar'] = RandomState(rng.randint(65635))
+        rngs = _spawn_rngs(rng.randint(2 ** 31 - 1),
+                           ['rng_map', 'rng_objects', 'rng_quest', 'rng_grammar'])
 
     # Generate only the map for now (i.e. without any objects)
     world = make_world(world_size, nb_objects=0, rngs=rngs)
 
     # Sample a quest according to quest_length.
-    class Options(ChainingOptions):
-
-        def get_rules(self, depth):
-            if depth == 0:
-		        # Last action should not be "go <dir>".
-                return data.get_rules().get_matching("^(?!go.*).*")
-            else:
-                return super().get_rules(depth)
-
-    options = Options()
+    options = _NonGoRulesOptions()
     options.backward = True
     options.min_depth = 1
     options.max_depth = quest_length
@@ -196,14 +275,12 @@ def make_game(world_size: int, nb_objects: int, quest_length: int, quest_breadth
     options.restricted_types = {"r", "d"}
     chain = sample_quest(world.state, options)
 
-    subquests = []
-    for i in range(1, len(chain.nodes)):
-        if chain.nodes[i].breadth != chain.nodes[i - 1].breadth:
-            quest = Quest(chain.actions[:i])
-            subquests.append(quest)
-
-    quest = Quest(chain.actions)
-    subquests.append(quest)
+    # A subquest ends wherever the breadth changes from one node to the next.
+    breadths = np.fromiter((node.breadth for node in chain.nodes),
+                           dtype=np.int32, count=len(chain.nodes))
+    boundaries = np.flatnonzero(np.diff(breadths)) + 1
+    subquests = [Quest.from_slice(chain.actions, 0, i) for i in boundaries.tolist()]
+    subquests.append(Quest(chain.actions))
 
     # Set the initial state required for the quest.
     world.state = chain.initial_state
@@ -218,6 +295,55 @@ def make_game(world_size: int, nb_objects: int, quest_length: int, quest_breadth
     return game
 
 
+def _game_fingerprint(game: Game) -> str:
+    """ Cheap identifier for a compiled game.
+
+    Hashing the serialized game is much cheaper than generating its
+    Inform 7 source, so the fingerprint can be checked before deciding
+    whether a recompilation is needed at all.
+    """
+    serialized = game.serialize()
+    # State facts are emitted in set-iteration order, which is not stable
+    # across processes; canonicalize them so the hash is deterministic.
+    serialized["state"] = sorted(json.dumps(fact, sort_keys=True)
+                                 for fact in serialized["state"])
+    payload = json.dumps(serialized, sort_keys=True)
+    game_hash = hashlib.sha256(payload.encode()).hexdigest()
+    return "{}\n{}".format(game.metadata.get("uuid", ""), game_hash)
+
+
+def _make_game_worker(spec: Mapping, seed_sequence) -> Game:
+    rngs = _spawn_rngs(seed_sequence,
+                       ['rng_map', 'rng_objects', 'rng_quest', 'rng_grammar'])
+    return make_game(rngs=rngs, **spec)
+
+
+def make_games(specs: Sequence[Mapping], n_workers: Optional[int] = None,
+               seed: Optional[int] = None) -> List[Game]:
+    """
+    Make several games in parallel.
+
+    Game generation is embarrassingly parallel, so the games are
+    dispatched to a pool of worker processes.
+
+    Arguments:
+        specs: One mapping of keyword arguments for :py:func:`make_game`
+            per game to generate.
+        n_workers: Number of worker processes. Default: number of CPUs.
+        seed: Master seed from which each game's random generators are
+            derived. Default: draw one from the global random generator.
+
+    Returns:
+        Generated games, in the same order as `specs`.
+    """
+    if seed is None:
+        seed = g_rng.next().randint(2 ** 31 - 1)
+
+    children = np.random.SeedSequence(seed).spawn(len(specs))
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(_make_game_worker, specs, children))
+
+
 def compile_game(game: Game, game_name: Optional[str] = None,
                  metadata: Mapping = {},
                  game_logger: Optional[GameLogger] = None,
@@ -245,34 +371,52 @@ def compile_game(game: Game, game_name: Optional[str] = None,
         The path to compiled game.
     """
     game_name = game_name or game.metadata["uuid"]
-    source = generate_inform7_source(game)
     maybe_mkdir(games_folder)
 
     if str2bool(os.environ.get("TEXTWORLD_FORCE_ZFILE", False)):
         file_type = ".z8"
 
-    game_json = pjoin(games_folder, game_name + ".json")
-    meta_json = pjoin(games_folder, game_name + ".meta")
-    game_file = pjoin(games_folder, game_name + file_type)
+    base = pjoin(games_folder, game_name)
+    game_json = base + ".json"
+    meta_json = base + ".meta"
+    game_file = base + file_type
+    fingerprint_file = base + ".fingerprint"
 
+    fingerprint = _game_fingerprint(game)
     already_compiled = False  # Check if game is already compiled.
     if not force_recompile and os.path.isfile(game_file) and os.path.isfile(game_json):
-        already_compiled = game == Game.load(game_json)
+        if os.path.isfile(fingerprint_file):
+            # Comparing fingerprints is much cheaper than deserializing the
+            # game and comparing the resulting objects structurally.
+            with open(fingerprint_file) as f:
+                already_compiled = f.read() == fingerprint
+        else:  # Legacy games compiled before fingerprints were introduced.
+            already_compiled = game == Game.load(game_json)
+            if already_compiled:
+                # Upgrade the game on disk so future checks are string compares.
+                with open(fingerprint_file, 'w') as f:
+                    f.write(fingerprint)
+
         msg = ("It's highly unprobable that two games with the same id have different structures."
                " That would mean the generator has been modified."
                " Please clean already generated games found in '{}'.".format(games_folder))
         assert already_compiled, msg
 
     if not already_compiled or force_recompile:
-        json.dump(metadata, open(meta_json, 'w'))
+        # Only generate the Inform 7 source when actually recompiling, and
+        # stream it straight to the story file instead of holding the whole
+        # text in memory.
+        story_file = base + ".ni"
+        with open(story_file, 'w') as f:
+            generate_inform7_source_to(f, game)
+
+        dump_json(metadata, meta_json)
         game.save(game_json)
-        compile_inform7_game(source, game_file)
+        compile_inform7_game_from_file(story_file, game_file)
+        with open(fingerprint_file, 'w') as f:
+            f.write(fingerprint)
 
     if game_logger is not None:
         game_logger.collect(game)
 
     return game_file
-
-
-# On module load.
-load_data()
@@ -94,6 +94,11 @@ class ChainingOptions:
             A set of types that may not have new variables created.
     """
 
+    __slots__ = ("backward", "min_depth", "max_depth", "min_breadth",
+                 "max_breadth", "subquests", "independent_chains",
+                 "create_variables", "fixed_mapping", "rng", "logic",
+                 "rules_per_depth", "restricted_types")
+
     def __init__(self):
         self.backward = False
         self.min_depth = 1
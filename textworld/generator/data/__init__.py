@@ -4,6 +4,7 @@
 
 from collections import OrderedDict
 import os
+import sys
 import glob
 from os.path import join as pjoin
 from shutil import copyfile, copytree, rmtree
@@ -74,12 +75,15 @@ _RULES = None
 _CONSTRAINTS = None
 _REVERSE_RULES = None
 
-INFORM7_COMMANDS = None
-INFORM7_EVENTS = None
-INFORM7_PREDICATES = None
-INFORM7_VARIABLES = None
-INFORM7_VARIABLES_DESCRIPTION = None
-INFORM7_ADDONS_CODE = None
+# Populated on first use by load_data() (see __getattr__ below).
+_INFORM7_NAMES = frozenset([
+    "INFORM7_COMMANDS",
+    "INFORM7_EVENTS",
+    "INFORM7_PREDICATES",
+    "INFORM7_VARIABLES",
+    "INFORM7_VARIABLES_DESCRIPTION",
+    "INFORM7_ADDONS_CODE",
+])
 
 
 def _to_type_tree(types):
@@ -183,30 +187,68 @@ def load_data(target_dir: Optional[str] = None):
     global _TEXT_GRAMMARS_PATH
     _TEXT_GRAMMARS_PATH = pjoin(target_dir, "text_grammars")
 
+    # Caches in textworld.generator built from these files are stale now.
+    # (The hasattr guard covers load_data being triggered while that
+    # package is still being imported.)
+    generator = sys.modules.get("textworld.generator")
+    if generator is not None and hasattr(generator, "_grammar_template"):
+        generator._grammar_template.cache_clear()
+        generator._non_go_rules.cache_clear()
+
+
+def _ensure_data_loaded():
+    """ Load the builtin data files on first use. """
+    if _LOGIC is None:
+        load_data()
+
+
+def __getattr__(name):
+    # Lazily trigger load_data() for callers reaching for the INFORM7_*
+    # tables, so importing the package does not pay the parsing cost.
+    if name in _INFORM7_NAMES:
+        _ensure_data_loaded()
+        return globals()[name]
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
 
 def get_logic():
+    _ensure_data_loaded()
     return _LOGIC
 
 
 def get_rules():
+    _ensure_data_loaded()
     return _RULES
 
 
 def get_constraints():
+    _ensure_data_loaded()
     return _CONSTRAINTS
 
 
 def get_reverse_rules(action):
+    _ensure_data_loaded()
     return _REVERSE_RULES(action)
 
 
 def get_types():
+    _ensure_data_loaded()
     return _TYPES
 
 
 def get_data_path():
+    _ensure_data_loaded()
     return _DATA_PATH
 
 
 def get_text_grammars_path():
+    _ensure_data_loaded()
     return _TEXT_GRAMMARS_PATH
+
+
+if sys.version_info < (3, 7):
+    # These interpreters never invoke the module-level __getattr__ above
+    # (PEP 562 is 3.7+), so load eagerly like this module always used to;
+    # otherwise the INFORM7_* tables would simply not exist.
+    load_data()
@@ -4,9 +4,11 @@
 
 import json
 
-from typing import List, Dict, Optional, Mapping, Any, Iterable
+from itertools import islice
+from typing import List, Dict, Optional, Mapping, Any, Iterable, Sequence
 from collections import OrderedDict
 
+from textworld.utils import dump_json
 from textworld.generator import data
 from textworld.generator.text_grammar import Grammar
 from textworld.generator.world import World
@@ -80,6 +82,50 @@ class Quest:
         self.win_action = self.set_winning_conditions(winning_conditions)
         self.fail_action = self.set_failing_conditions(failing_conditions)
 
+    @classmethod
+    def from_slice(cls, actions: Sequence[Action], start: int, end: int,
+                   desc: Optional[str] = None) -> "Quest":
+        """ Creates a `Quest` from a segment of an action sequence.
+
+        The quest keeps a reference to the backing sequence instead of
+        copying the segment; its `actions` tuple is only materialized on
+        first access. Useful when carving many subquests out of the same
+        chain of actions.
+
+        Args:
+            actions: Sequence backing the quest's actions.
+            start: Index of the first action of the quest.
+            end: Index one past the last action of the quest.
+            desc: A text description of the quest.
+        """
+        if end <= start:
+            raise UnderspecifiedQuestError()
+
+        quest = cls.__new__(cls)
+        quest._actions = actions if isinstance(actions, tuple) else tuple(actions)
+        quest._slice = (start, end)
+        quest.desc = desc
+        quest.commands = gen_commands_from_actions(islice(quest._actions, start, end))
+        quest.reward = 1
+        quest.win_action = quest.set_winning_conditions(quest._actions[end - 1].postconditions)
+        quest.fail_action = quest.set_failing_conditions(None)
+        return quest
+
+    @property
+    def actions(self) -> Iterable[Action]:
+        if self._slice is not None:
+            # Materialize the view on first access.
+            start, end = self._slice
+            self._actions = self._actions[start:end]
+            self._slice = None
+
+        return self._actions
+
+    @actions.setter
+    def actions(self, actions: Optional[Iterable[Action]]) -> None:
+        self._actions = tuple(actions) if actions else ()
+        self._slice = None
+
     def set_winning_conditions(self, winning_conditions: Optional[Collection[Proposition]]) -> Action:
         """ Sets wining conditions for this quest.
 
@@ -328,8 +374,7 @@ class Game:
 
     def save(self, filename: str) -> None:
         """ Saves the serialized data of this game to a file. """
-        with open(filename, 'w') as f:
-            json.dump(self.serialize(), f)
+        dump_json(self.serialize(), filename)
 
     @classmethod
     def load(cls, filename: str) -> "Game":
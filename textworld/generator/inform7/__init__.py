@@ -3,7 +3,9 @@
 
 
 from textworld.generator.inform7.world2inform7 import generate_inform7_source
+from textworld.generator.inform7.world2inform7 import generate_inform7_source_to
 from textworld.generator.inform7.world2inform7 import compile_inform7_game
+from textworld.generator.inform7.world2inform7 import compile_inform7_game_from_file
 from textworld.generator.inform7.world2inform7 import gen_commands_from_actions
 from textworld.generator.inform7.world2inform7 import find_action_given_inform7_event
 from textworld.generator.inform7.world2inform7 import CouldNotCompileGameError
@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 
+import os
 import itertools
 
 import textworld
@@ -298,3 +299,60 @@ def test_take_all_and_variants():
         assert "blue ball:" in game_state.feedback
         assert "red ball" in game_state.inventory
         assert "blue ball" in game_state.inventory
+
+
+def test_compile_cache():
+    from os.path import join as pjoin
+    from textworld.generator import inform7
+    from textworld.generator.inform7 import world2inform7
+
+    compile_counts = []
+
+    def _fake_compile(story_filename, output, verbose=False):
+        compile_counts.append(story_filename)
+        with open(story_filename) as f:
+            source = f.read()
+        with open(output, 'w') as f:
+            f.write("compiled:" + source)
+
+    orig_compile = world2inform7._compile_story_file
+    orig_cache_dir = os.environ.get("TEXTWORLD_COMPILE_CACHE")
+    world2inform7._compile_story_file = _fake_compile
+    try:
+        with make_temp_directory(prefix="test_compile_cache") as tmpdir:
+            os.environ["TEXTWORLD_COMPILE_CACHE"] = pjoin(tmpdir, "cache")
+            story_file = pjoin(tmpdir, "story.ni")
+            out1 = pjoin(tmpdir, "game1.ulx")
+            out2 = pjoin(tmpdir, "game2.ulx")
+
+            with open(story_file, 'w') as f:
+                f.write("source one")
+
+            # Miss then hit: the compiler only runs once for identical sources.
+            inform7.compile_inform7_game_from_file(story_file, out1)
+            inform7.compile_inform7_game_from_file(story_file, out2)
+            assert len(compile_counts) == 1
+            with open(out2) as f:
+                assert f.read() == "compiled:source one"
+
+            # Recompiling different source to the same output must not
+            # corrupt the previous hash's cache entry through the hardlink.
+            with open(story_file, 'w') as f:
+                f.write("source two")
+
+            inform7.compile_inform7_game_from_file(story_file, out1)
+            assert len(compile_counts) == 2
+
+            with open(story_file, 'w') as f:
+                f.write("source one")
+
+            inform7.compile_inform7_game_from_file(story_file, out1)
+            assert len(compile_counts) == 2  # Still served from the cache.
+            with open(out1) as f:
+                assert f.read() == "compiled:source one"
+    finally:
+        world2inform7._compile_story_file = orig_compile
+        if orig_cache_dir is None:
+            del os.environ["TEXTWORLD_COMPILE_CACHE"]
+        else:
+            os.environ["TEXTWORLD_COMPILE_CACHE"] = orig_cache_dir
@@ -6,13 +6,14 @@ import re
 import json
 import os
 import shutil
+import hashlib
 import subprocess
 import textwrap
 from os.path import join as pjoin
 
 from pkg_resources import Requirement, resource_filename
 
-from textworld.utils import make_temp_directory, str2bool
+from textworld.utils import make_temp_directory, maybe_mkdir, str2bool
 
 from textworld.generator import data
 
@@ -23,6 +24,9 @@ from textworld.generator.inform7.grammar import define_inform7_kinds
 
 I7_DEFAULT_PATH = resource_filename(Requirement.parse('textworld'), 'textworld/thirdparty/inform7-6M62')
 
+#: Upper bound on the number of compiled games kept in the compile cache.
+_COMPILE_CACHE_MAX_ENTRIES = 256
+
 
 class CouldNotCompileGameError(RuntimeError):
     pass
@@ -150,23 +154,23 @@ def find_action_given_inform7_event(i7_event, actions, var_infos):
     return None
 
 
-def generate_inform7_source(game, seed=1234, use_i7_description=False):
+def _gen_inform7_source(game, seed=1234, use_i7_description=False):
+    """ Generate the Inform 7 source of a game, one chunk at a time. """
     var_infos = game.infos
     world = game.world
     quests = game.quests
 
-    source = ""
-    source += "When play begins, seed the random-number generator with {}.\n\n".format(seed)
-    source += define_inform7_kinds()
+    yield "When play begins, seed the random-number generator with {}.\n\n".format(seed)
+    yield define_inform7_kinds()
     # Mention that rooms have a special text attribute called 'internal name'.
-    source += "A room has a text called internal name.\n\n"
+    yield "A room has a text called internal name.\n\n"
 
     # Define custom addons.
-    source += data.INFORM7_ADDONS_CODE + "\n"
+    yield data.INFORM7_ADDONS_CODE + "\n"
 
     # Declare all rooms.
     room_names = [room.id for room in world.rooms]
-    source += "The " + " and the ".join(room_names) + " are rooms.\n\n"
+    yield "The " + " and the ".join(room_names) + " are rooms.\n\n"
 
     # Process the rooms.
     for room in world.rooms:
@@ -176,8 +180,8 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
         if not use_i7_description:
             # Describe the room.
             room_desc = room_infos.desc
-            source += "The internal name of {} is \"{}\".\n".format(room.id, room_name)
-            source += "The printed name of {} is \"-= {} =-\".\n".format(room.id, str.title(room_name))
+            yield "The internal name of {} is \"{}\".\n".format(room.id, room_name)
+            yield "The printed name of {} is \"-= {} =-\".\n".format(room.id, str.title(room_name))
 
             parts = []
             splits = re.split("\[end if\]", room_desc)
@@ -187,14 +191,14 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
                 if split != splits[-1]:
                     split += "[end if]"
 
-                source += text.format(name=part_name, desc=split)
+                yield text.format(name=part_name, desc=split)
                 parts.append(part_name)
 
-            source += "The description of {} is \"{}\".\n".format(room.id, "".join("[{}]".format(part) for part in parts))
-            source += "\n"
+            yield "The description of {} is \"{}\".\n".format(room.id, "".join("[{}]".format(part) for part in parts))
+            yield "\n"
 
         # List the room's attributes.
-        source += gen_source_for_map(room)
+        yield gen_source_for_map(room)
 
     # Declare all objects
     for vtype in data.get_types():
@@ -207,18 +211,18 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
 
         kind = data.INFORM7_VARIABLES[vtype]
         names = [entity.id for entity in entities]
-        source += "The " + " and the ".join(names) + " are {}s.\n".format(kind)
+        yield "The " + " and the ".join(names) + " are {}s.\n".format(kind)
         # All objects are privately-named and we manually define all "Understand as" phrases needed.
-        source += "The " + " and the ".join(names) + " are privately-named.\n"
+        yield "The " + " and the ".join(names) + " are privately-named.\n"
 
     # Process the objects.
-    source += "\n"
-    source += gen_source_for_objects(world.objects, var_infos,
+    yield "\n"
+    yield gen_source_for_objects(world.objects, var_infos,
                                      use_i7_description=use_i7_description)
-    source += "\n\n"
+    yield "\n\n"
 
     # Place the player.
-    source += "The player is in {}.\n\n".format(var_infos[world.player_room.id].id)
+    yield "The player is in {}.\n\n".format(var_infos[world.player_room.id].id)
 
     objective = game.objective
     maximum_score = 0
@@ -231,10 +235,10 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
         The quest{quest_id} completed is a truth state that varies.
         The quest{quest_id} completed is usually false.
         """)
-        source += quest_completed.format(quest_id=quest_id)
+        yield quest_completed.format(quest_id=quest_id)
 
         walkthrough = '\nTest quest{} with "{}"\n\n'.format(quest_id, " / ".join(commands))
-        source += walkthrough
+        yield walkthrough
 
         # Add winning and losing conditions for quest.
         quest_ending_condition = """\
@@ -257,11 +261,11 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
                                                                winning_tests=winning_tests,
                                                                reward=quest.reward,
                                                                quest_id=quest_id)
-        source += textwrap.dedent(quest_ending_condition)
+        yield textwrap.dedent(quest_ending_condition)
 
     # Enable scoring is at least one quest has nonzero reward.
     if maximum_score != 0:
-        source += "Use scoring. The maximum score is {}.\n".format(maximum_score)
+        yield "Use scoring. The maximum score is {}.\n".format(maximum_score)
 
     # Build test condition for winning the game.
     game_winning_test = "1 is 0 [always false]"
@@ -272,7 +276,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     # Remove square bracket when printing score increases. Square brackets are conflicting with 
     # Inform7's events parser in git_glulx_ml.py.
     # And add winning conditions for the game.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     This is the simpler notify score changes rule:
         If the score is not the last notified score:
             let V be the score - the last notified score;
@@ -291,7 +295,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
 
     if not use_i7_description:
         # Remove Inform7 listing of nondescript items.
-        source += textwrap.dedent("""\
+        yield textwrap.dedent("""\
         Rule for listing nondescript items:
             stop.
 
@@ -299,7 +303,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
 
     else:
         # List exits in room description
-        source += textwrap.dedent("""\
+        yield textwrap.dedent("""\
         [Ref: http://dhayton.haverford.edu/wp-content/uploads/Inform-manuals/Rex434.html#e434]
         The initial appearance of a door is usually "Nearby [an item described] leads [if the other side of the item described is visited][direction of the item described from the location] to [the other side][otherwise][direction of the item described from the location][end if]. It is [if open]open[else if closed]closed[otherwise]closed[end if]."
 
@@ -318,7 +322,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
 
         """)
 
-        source += textwrap.dedent("""\
+        yield textwrap.dedent("""\
         Definition: a direction (called thataway) is viable if the room thataway from the location is a room and the room-or-door thataway from the location is a room.
 
         After looking:
@@ -328,14 +332,14 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
         """)
 
     # Replace default banner with a greeting message and the quest description.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Rule for printing the banner text:
         say "{objective}[line break]".
 
     """.format(objective=objective))
 
     # Simply display *** The End *** when game ends.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Include Basic Screen Effects by Emily Short.
 
     Rule for printing the player's obituary:
@@ -355,7 +359,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Disable implicitly taking something.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Rule for implicitly taking something (called target):
         if target is fixed in place:
             say "The [target] is fixed in place.";
@@ -366,7 +370,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Referring to an object by its whole name shouldn't be ambiguous.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Does the player mean doing something:
         if the noun is not nothing and the second noun is nothing and the player's command matches the text printed name of the noun:
             it is likely;
@@ -377,7 +381,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Useful for listing room contents with their properties.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Printing the content of the room is an activity.
     Rule for printing the content of the room:
         let R be the location of the player;
@@ -387,7 +391,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Useful for listing world contents with their properties.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Printing the content of the world is an activity.
     Rule for printing the content of the world:
         let L be the list of the rooms;
@@ -404,7 +408,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Useful for listing inventory contents with their properties.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Printing the content of the inventory is an activity.
     Rule for printing the content of the inventory:
         say "Inventory:[line break]";
@@ -413,7 +417,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Useful for listing off-stage contents with their properties.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Printing the content of nowhere is an activity.
     Rule for printing the content of nowhere:
         say "Nowhere:[line break]";
@@ -424,7 +428,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Useful for listing things laying on the floor.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Printing the things on the floor is an activity.
     Rule for printing the things on the floor:
         let R be the location of the player;
@@ -439,7 +443,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Print properties of objects when listing the inventory contents and the room contents.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     After printing the name of something (called target) while
     printing the content of the room
     or printing the content of the world
@@ -488,12 +492,12 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
 
     """)
 
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     An objective is some text that varies. The objective is "{objective}".
     """.format(objective=objective))
 
     # Special command to print the objective of the game, if any.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Printing the objective is an action applying to nothing.
     Carry out printing the objective:
         say "[objective]".
@@ -504,7 +508,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
 
     # Customize reporting of the "take" action.
     # Ref: http://inform7.com/learn/man/RB_6_8.html
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     The taking action has an object called previous locale (matched as "from").
 
     Setting action variables for taking: 
@@ -522,7 +526,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Special command to print game state.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     The print state option is a truth state that varies.
     The print state option is usually false.
 
@@ -582,7 +586,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Disable implicitly opening/unlocking door.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Before going through a closed door (called the blocking door):
         say "You have to open the [blocking door] first.";
         stop.
@@ -606,7 +610,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Add new actions.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     Displaying help message is an action applying to nothing.
     Carry out displaying help message:
         say "[fixed letter spacing]Available commands:[line break]";
@@ -631,7 +635,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Disable take/get all.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
         Taking all is an action applying to nothing.
         Carry out taking all:
             say "You have to be more specific!".
@@ -651,7 +655,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Special command to restrict possible actions.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     The restrict commands option is a truth state that varies.
     The restrict commands option is usually false.
 
@@ -666,7 +670,7 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
 
     # If "restrict commands" mode is on, force the player to mention where to
     # take the object from.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
     The taking allowed flag is a truth state that varies.
     The taking allowed flag is usually false.
 
@@ -689,29 +693,108 @@ def generate_inform7_source(game, seed=1234, use_i7_description=False):
     """)
 
     # Add dummy object to detect end of the objects tree.
-    source += textwrap.dedent("""\
+    yield textwrap.dedent("""\
         There is a EndOfObject.
 
     """)
 
-    # Indent using \t instead of spaces because of Inform6.
+
+def _convert_indentation(text):
+    """ Indent using \\t instead of spaces because of Inform6. """
     while True:
-        last = source
-        source = re.sub("(^ *)    ", r"\1\t", source, flags=re.MULTILINE)
-        if source == last:
+        last = text
+        text = re.sub("(^ *)    ", r"\1\t", text, flags=re.MULTILINE)
+        if text == last:
             break
 
-    return source
+    return text
+
+
+def generate_inform7_source(game, seed=1234, use_i7_description=False):
+    return "".join(_convert_indentation(chunk)
+                   for chunk in _gen_inform7_source(game, seed, use_i7_description))
+
+
+def generate_inform7_source_to(fp, game, seed=1234, use_i7_description=False):
+    """ Write the Inform 7 source of a game directly to an open file.
+
+    Unlike :py:func:`generate_inform7_source`, the full source is never
+    held in memory.
+    """
+    for chunk in _gen_inform7_source(game, seed, use_i7_description):
+        fp.write(_convert_indentation(chunk))
 
 
 def compile_inform7_game(source, output, verbose=False):
-    with make_temp_directory(prefix="tmp_inform") as project_folder:
-        filename, ext = os.path.splitext(output)
-        story_filename = filename + ".ni"
+    filename, ext = os.path.splitext(output)
+    story_filename = filename + ".ni"
+
+    # Save story file.
+    with open(story_filename, 'w') as f:
+        f.write(source)
+
+    compile_inform7_game_from_file(story_filename, output, verbose)
+
 
-        # Save story file.
-        with open(story_filename, 'w') as f:
-            f.write(source)
+def _link_or_copy(src, dest):
+    """ Hardlink a file, falling back on a copy across filesystems. """
+    if os.path.exists(dest):
+        os.remove(dest)
+
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy(src, dest)
+
+
+def _prune_compile_cache(cache_dir, max_entries=_COMPILE_CACHE_MAX_ENTRIES):
+    """ Evict the least recently used compiled games from the cache. """
+    entries = [entry for entry in os.scandir(cache_dir) if entry.is_file()]
+    if len(entries) <= max_entries:
+        return
+
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - max_entries]:
+        os.remove(entry.path)
+
+
+def compile_inform7_game_from_file(story_filename, output, verbose=False):
+    """ Compile an Inform 7 story file that is already on disk.
+
+    When the TEXTWORLD_COMPILE_CACHE environment variable points to a
+    directory, compiled games are cached there keyed on the sha256 of
+    their source, so recompiling an identical story (e.g. isomorphic
+    games with different uuids) is a hardlink instead of a compiler run.
+    """
+    cache_dir = os.environ.get("TEXTWORLD_COMPILE_CACHE")
+    cached_file = None
+    if cache_dir:
+        with open(story_filename, 'rb') as f:
+            source_hash = hashlib.sha256(f.read()).hexdigest()
+
+        maybe_mkdir(cache_dir)
+        cached_file = pjoin(cache_dir, source_hash + os.path.splitext(output)[1])
+        if os.path.isfile(cached_file):
+            _link_or_copy(cached_file, output)
+            os.utime(cached_file)  # Keep the LRU ordering up-to-date.
+            return
+
+    # A previous compile may have hardlinked output into the cache; unlink
+    # it so the compiler cannot write through the shared inode and corrupt
+    # the cache entry of another source hash.
+    if os.path.exists(output):
+        os.remove(output)
+
+    _compile_story_file(story_filename, output, verbose)
+
+    if cached_file is not None:
+        _link_or_copy(output, cached_file)
+        _prune_compile_cache(cache_dir)
+
+
+def _compile_story_file(story_filename, output, verbose=False):
+    with make_temp_directory(prefix="tmp_inform") as project_folder:
+        ext = os.path.splitext(output)[1]
 
         # Create the file structure needed by Inform7.
         source_folder = pjoin(project_folder, "Source")
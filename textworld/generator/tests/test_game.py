@@ -63,6 +63,26 @@ def test_game_comparison():
     assert game1 != game3
 
 
+def test_quest_from_slice():
+    g_rng.set_seed(2018)
+    map_ = make_small_map(n_rooms=2)
+    world = World.from_map(map_)
+    world.set_player_room()
+    world.populate(nb_objects=5)
+
+    options = ChainingOptions()
+    options.backward = True
+    options.max_depth = 3
+    options.create_variables = True
+    chain = sample_quest(world.state, options)
+
+    # A sliced quest is indistinguishable from one built on a copied prefix.
+    for i in range(1, len(chain.actions) + 1):
+        assert Quest.from_slice(chain.actions, 0, i) == Quest(chain.actions[:i])
+
+    npt.assert_raises(UnderspecifiedQuestError, Quest.from_slice, chain.actions, 0, 0)
+
+
 def test_variable_infos(verbose=False):
     g_rng.set_seed(1234)
     grammar_flags = {"theme": "house", "include_adj": True}
@@ -2,9 +2,15 @@
 # Licensed under the MIT license.
 
 
+from os.path import join as pjoin
+
 import numpy.testing as npt
 
+from textworld import g_rng
+from textworld.utils import make_temp_directory
 from textworld.generator import make_world, make_small_map, make_world_with
+from textworld.generator import make_game, make_games, make_grammar, _game_fingerprint
+from textworld.generator.game import Game
 
 from textworld.logic import Variable, Proposition
 
@@ -29,3 +35,48 @@ def test_make_world_with():
     P = Variable('P')
     world = make_world_with(rooms=[r1])
     assert Proposition('at', [P, r1]) in world.facts
+
+
+def test_make_games():
+    specs = [dict(world_size=world_size, nb_objects=3, quest_length=2, quest_breadth=1)
+             for world_size in [1, 2, 3]]
+    games = make_games(specs, n_workers=2, seed=20180514)
+
+    # Games come back in spec order.
+    assert [len(game.world.rooms) for game in games] == [1, 2, 3]
+
+    # Same seed, same games - regardless of the number of workers.
+    games2 = make_games(specs, n_workers=1, seed=20180514)
+    assert games == games2
+
+
+def test_make_grammar_returns_independent_copies():
+    grammar1 = make_grammar({})
+    nb_expansions = sum(len(v) for v in grammar1.grammar.values())
+
+    # Mutating one grammar must not poison the cached template.
+    for k, v in grammar1.grammar.items():
+        grammar1.grammar[k] = v[:2]
+    grammar1.flags.only_last_action = True
+
+    grammar2 = make_grammar({})
+    assert sum(len(v) for v in grammar2.grammar.values()) == nb_expansions
+    assert not grammar2.flags.only_last_action
+
+
+def test_game_fingerprint_is_stable():
+    g_rng.set_seed(1234)
+    game = make_game(world_size=2, nb_objects=3, quest_length=2, quest_breadth=1)
+    fingerprint = _game_fingerprint(game)
+
+    # Saving then reloading the game must not change its fingerprint,
+    # even though deserializing rebuilds the state facts in another order.
+    with make_temp_directory(prefix="test_game_fingerprint") as tmpdir:
+        game_json = pjoin(tmpdir, "game.json")
+        game.save(game_json)
+        assert _game_fingerprint(Game.load(game_json)) == fingerprint
+
+    # An identical game generated from the same seed matches too.
+    g_rng.set_seed(1234)
+    game2 = make_game(world_size=2, nb_objects=3, quest_length=2, quest_breadth=1)
+    assert _game_fingerprint(game2) == fingerprint
@@ -488,13 +488,16 @@ class World:
 
     def populate(self, nb_objects: int,
                  rng: Optional[RandomState] = None,
-                 object_types_probs: Optional[Dict[str, float]] = None) -> List[Proposition]:
+                 object_types_probs: Optional[Dict[str, float]] = None,
+                 random_pool: Optional[np.ndarray] = None) -> List[Proposition]:
         rng = g_rng.next() if rng is None else rng
         room_names = [room.id for room in self.rooms]
         nb_objects_per_room = {room_name: 0 for room_name in room_names}
-        indices = np.arange(len(room_names))
-        for _ in range(nb_objects):
-            idx = rng.choice(indices)
+        if random_pool is None:
+            # One vectorized draw instead of one rng.choice call per object.
+            random_pool = rng.randint(0, 2 ** 31 - 1, size=nb_objects)
+
+        for idx in np.asarray(random_pool)[:nb_objects] % len(room_names):
             nb_objects_per_room[room_names[idx]] += 1
 
         state = []
@@ -4,13 +4,21 @@
 
 import os
 import re
+import json
 import shutil
+import inspect
 import tempfile
+import functools
 import contextlib
 from collections import OrderedDict
 
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class RandomGenerator:
     """ Random generator controlling the games generation. """
@@ -36,6 +44,30 @@ class RandomGenerator:
         return rng
 
 
+def default_rng(argname):
+    """ Inject the global random generator as an argument's default.
+
+    Replaces the ``rng = g_rng.next() if rng is None else rng`` idiom:
+    whenever the named argument is missing or `None`, a fresh generator
+    drawn from :py:data:`g_rng` is passed instead.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind_partial(*args, **kwargs)
+            if bound.arguments.get(argname) is None:
+                bound.arguments[argname] = g_rng.next()
+
+            bound.apply_defaults()
+            return fn(*bound.args, **bound.kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 def which(program):
     """
     helper to see if a program is in PATH
@@ -112,7 +144,11 @@ class RegexDict(OrderedDict):
     https://stackoverflow.com/questions/21024822/python-accessing-dictionary-with-wildcards.
     """
     def get_matching(self, *regexes):
-        """ Query the dictionary using a regex. """
+        """ Query the dictionary using regexes.
+
+        The regexes can either be strings or precompiled patterns. The
+        latter avoids recompiling the same pattern on every query.
+        """
         matches = []
         for regex in regexes:
             matches += [self[key] for key in self if re.fullmatch(regex, key)]
@@ -123,6 +159,28 @@ class RegexDict(OrderedDict):
         return matches
 
 
+def dump_json(obj, filename):
+    """ Serialize an object to a JSON file.
+
+    Uses `orjson` when available, which is considerably faster than the
+    stdlib encoder, and falls back on `json` otherwise.
+    """
+    if orjson is not None:
+        try:
+            # OPT_SERIALIZE_NUMPY: accept numpy scalars (e.g. the np.int64
+            # seeds stored in game metadata), like the stdlib encoder does.
+            payload = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # Fall back on the more permissive stdlib encoder.
+        else:
+            with open(filename, 'wb') as f:
+                f.write(payload)
+            return
+
+    with open(filename, 'w') as f:
+        json.dump(obj, f)
+
+
 def str2bool(v):
     """ Convert string to a boolean value.
     References